@@ -0,0 +1,12 @@
+import sys
+import pytest
+sys.path.insert(0,"../")
+sys.path.insert(0,"./")
+import tidal_analysis
+
+
+@pytest.fixture(autouse=True)
+def no_parquet_copies(monkeypatch):
+    # parse the data files in every test rather than reading (or leaving)
+    # Parquet copies in data/; tests of the copies turn them back on
+    monkeypatch.setattr(tidal_analysis, "PARQUET_COPIES", False)
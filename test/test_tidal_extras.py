@@ -0,0 +1,252 @@
+import pytest
+import sys
+import os
+sys.path.insert(0,"../")
+sys.path.insert(0,"./")
+import tidal_analysis as tidal_module
+from tidal_analysis import *
+import pandas as pd
+import numpy as np
+
+class TestTidalExtras():
+
+    def test_reading_dtypes(self):
+        tidal_file = "data/1947ABE.txt"
+
+        data = read_tidal_data(tidal_file)
+        # sea level is typed as it is parsed, and unused columns are skipped
+        assert data['Sea Level'].dtype == np.float32
+        assert list(data.columns) == ['Date', 'Time', 'Sea Level']
+
+    def test_reading_without_pyarrow(self, monkeypatch, request):
+        tidal_file = "data/1947ABE.txt"
+        # don't leave the fallback's data cached for later tests
+        request.addfinalizer(tidal_module._read_tidal_file.cache_clear)
+
+        data = read_tidal_data(tidal_file)
+        # the C engine fallback should give the same data
+        monkeypatch.setattr(tidal_module, "pa", None)
+        monkeypatch.setattr(tidal_module, "pa_csv", None)
+        tidal_module._read_tidal_file.cache_clear()
+        fallback = read_tidal_data(tidal_file)
+        pd.testing.assert_index_equal(data.index, fallback.index)
+        pd.testing.assert_series_equal(data['Sea Level'], fallback['Sea Level'])
+
+    def test_sea_level_rise_matches_linregress(self):
+        from scipy import stats
+
+        data = read_tidal_data("data/1947ABE.txt")
+        slope, p_value = sea_level_rise(data)
+        # the closed-form regression should agree with scipy
+        sea_level = data['Sea Level'].dropna()
+        expected = stats.linregress(sea_level.index.asi8 / 86400e9,
+                                    sea_level.to_numpy(dtype=np.float64))
+        assert slope == pytest.approx(expected.slope)
+        assert p_value == pytest.approx(expected.pvalue)
+
+        # the degenerate cases should give what linregress gives
+        index = pd.date_range("2000-01-01", periods=3, freq="D")
+        for sea_level in ([1.0, 2.0, np.nan], [1.0, 1.0, np.nan],
+                          [1.0, 1.0, 1.0], [1.0, 2.0, 3.0]):
+            data = pd.DataFrame({'Sea Level': sea_level}, index=index)
+            slope, p_value = sea_level_rise(data)
+            valid = ~np.isnan(sea_level)
+            expected = stats.linregress(index.asi8[valid] / 86400e9,
+                                        np.array(sea_level)[valid])
+            assert slope == pytest.approx(expected.slope)
+            assert p_value == pytest.approx(expected.pvalue, abs=1e-9, nan_ok=True)
+
+    def test_longest_contiguous_interior_run(self):
+        index = pd.date_range("2000-01-01", periods=10, freq="h")
+        sea_level = [1.0, np.nan, 1.0, 2.0, 3.0, 4.0, np.nan, 1.0, 2.0, np.nan]
+        data = pd.DataFrame({'Sea Level': sea_level}, index=index)
+
+        # the longest run sits between two gaps, not at the start
+        longest = get_longest_contiguous_data(data)
+        assert longest['Sea Level'].size == 4
+        assert longest.index[0] == index[2]
+        assert longest.index[-1] == index[5]
+
+        # no valid data gives an empty frame
+        data['Sea Level'] = np.nan
+        assert get_longest_contiguous_data(data).empty
+
+    def test_float32_matches_float64(self):
+        tidal_file = "data/1947ABE.txt"
+        data = read_tidal_data(tidal_file)
+        # an independent float64 parse of the file, not an upcast of the float32 data
+        raw = pd.read_csv(tidal_file, sep=r'\s+', skiprows=11, header=None, engine='c',
+                          names=['Cycle', 'Date', 'Time', 'Sea Level', 'Residual'],
+                          usecols=['Date', 'Time', 'Sea Level'], dtype=str)
+        data64 = pd.DataFrame(
+            {'Sea Level': pd.to_numeric(raw['Sea Level'], errors='coerce').to_numpy(np.float64)},
+            index=pd.to_datetime(raw['Date'] + ' ' + raw['Time'], format='%Y/%m/%d %H:%M:%S')
+        )
+        assert data64['Sea Level'].dtype == np.float64
+        assert (data.index == data64.index).all()
+        np.testing.assert_array_almost_equal(data['Sea Level'], data64['Sea Level'], decimal=5)
+
+        # float32 storage should not change the analysis results
+        slope, p_value = sea_level_rise(data)
+        slope64, p_value64 = sea_level_rise(data64)
+        assert slope == pytest.approx(slope64, rel=1e-5)
+        assert p_value == pytest.approx(p_value64, abs=1e-5)
+
+        section = extract_section_remove_mean("19470115", "19470310", data)
+        section64 = extract_section_remove_mean("19470115", "19470310", data64)
+        np.testing.assert_allclose(section['Sea Level'], section64['Sea Level'],
+                                   atol=1e-5)
+
+    def test_reading_is_cached(self):
+        tidal_file = "data/1947ABE.txt"
+
+        data = read_tidal_data(tidal_file)
+        # changing the returned data must not change later reads
+        data['Sea Level'] = 0.0
+        again = read_tidal_data(tidal_file)
+        assert again['Sea Level'].isnull().any()
+        assert tidal_module._read_tidal_file.cache_info().hits > 0
+
+    def test_reading_parquet_copy(self, tmp_path, monkeypatch):
+        import shutil
+        monkeypatch.setattr(tidal_module, "PARQUET_COPIES", True)
+        tidal_file = str(tmp_path / "1947ABE.txt")
+        shutil.copy("data/1947ABE.txt", tidal_file)
+
+        data = read_tidal_data(tidal_file)
+        # the parsed data is saved next to the file and read back unchanged
+        assert (tmp_path / "1947ABE.txt.parquet").exists()
+        tidal_module._read_tidal_file.cache_clear()
+        again = read_tidal_data(tidal_file)
+        pd.testing.assert_frame_equal(data, again)
+
+        # a copy written by another version of the parser is parsed again
+        parse = tidal_module._read_gauge_arrow
+        parsed = []
+        monkeypatch.setattr(tidal_module, "_read_gauge_arrow",
+                            lambda *args: parsed.append(args) or parse(*args))
+        tidal_module._read_tidal_file.cache_clear()
+        read_tidal_data(tidal_file)
+        assert not parsed
+        monkeypatch.setattr(tidal_module, "CACHE_VERSION", tidal_module.CACHE_VERSION + 1)
+        tidal_module._read_tidal_file.cache_clear()
+        pd.testing.assert_frame_equal(data, read_tidal_data(tidal_file))
+        assert len(parsed) == 1
+
+        # an edited file is parsed again, even with an older modification time
+        with open(tidal_file) as f:
+            text = f.read()
+        with open(tidal_file, "w") as f:
+            f.write(text.replace("2.1336M", "2.1336 ", 1))
+        os.utime(tidal_file, ns=(10**18, 10**18))
+        tidal_module._read_tidal_file.cache_clear()
+        edited = read_tidal_data(tidal_file)
+        assert np.isnan(data['Sea Level'].iloc[0])
+        assert edited['Sea Level'].iloc[0] == pytest.approx(2.1336)
+
+    def test_tidal_analysis_needs_aware_start(self):
+        data = extract_section_remove_mean("19470115", "19470310",
+                                           read_tidal_data("data/1947ABE.txt"))
+
+        # a naive start time is ambiguous, so it is rejected
+        with pytest.raises(ValueError):
+            tidal_analysis(data, ['M2', 'S2'], datetime.datetime(1947, 1, 15))
+
+        # a UTC index gives the same result as a naive one
+        start = datetime.datetime(1947, 1, 15, tzinfo=pytz.utc)
+        amp, pha = tidal_analysis(data, ['M2', 'S2'], start)
+        amp_utc, pha_utc = tidal_analysis(data.tz_localize('utc'), ['M2', 'S2'], start)
+        np.testing.assert_allclose(amp, amp_utc)
+        np.testing.assert_allclose(pha, pha_utc)
+
+    def test_harmonic_fit_matches_uptide(self):
+        import uptide
+
+        data = read_tidal_data("data/1947ABE.txt").dropna(subset=['Sea Level'])
+        start = datetime.datetime(1947, 1, 1, tzinfo=pytz.utc)
+
+        # with and without Z0, and over a short (ill-conditioned) two day record,
+        # the fit should agree with uptide's own
+        for record in (data, data.iloc[:48]):
+            sea_level = record['Sea Level'].to_numpy(dtype=np.float64)
+            seconds = (record.index.asi8 - pd.Timestamp(start).value) * 1e-9
+            for constituents in (['M2', 'S2', 'N2', 'K2', 'K1', 'O1', 'P1', 'Q1'],
+                                 ['Z0', 'M2', 'S2']):
+                tide = uptide.Tides(constituents)
+                tide.set_initial_time(start)
+                amp, pha = tidal_module._harmonic_fit(tide, sea_level, seconds)
+                expected_amp, expected_pha = uptide.harmonic_analysis(tide, sea_level, seconds)
+                np.testing.assert_allclose(amp, expected_amp, atol=1e-9)
+                np.testing.assert_allclose(np.cos(pha - expected_pha), 1.0)
+
+    def test_directory_cache_follows_files(self, tmp_path, monkeypatch, capsys):
+        import shutil
+        for name in ("1946ABE.txt", "1947ABE.txt"):
+            shutil.copy2("data/" + name, tmp_path / name)
+        paths = [str(tmp_path / "1946ABE.txt"), str(tmp_path / "1947ABE.txt")]
+
+        compiled = tidal_module._load_or_cache(str(tmp_path), paths, False)
+        assert (tmp_path / "_cache.parquet").exists()
+        location = list(compiled)[0]
+        assert compiled[location]['Sea Level'].size == 8760*2
+
+        # removing a file must not serve the cached data
+        os.remove(paths[1])
+        compiled = tidal_module._load_or_cache(str(tmp_path), paths[:1], False)
+        assert compiled[location]['Sea Level'].size == 8760
+
+        # nor must adding one back with an older modification time
+        shutil.copy2("data/1947ABE.txt", paths[1])
+        compiled = tidal_module._load_or_cache(str(tmp_path), paths, False)
+        assert compiled[location]['Sea Level'].size == 8760*2
+
+        # files given out of date order are still compiled in order
+        compiled = tidal_module._load_or_cache(str(tmp_path), paths[::-1], False)
+        assert compiled[location]['Sea Level'].size == 8760*2
+        assert compiled[location].index.is_monotonic_increasing
+
+        # a cache written by another version of the parser is not loaded
+        tidal_module._load_or_cache(str(tmp_path), paths, False)
+        tidal_module._load_or_cache(str(tmp_path), paths, True)
+        assert "Loading cached data" in capsys.readouterr().out
+        monkeypatch.setattr(tidal_module, "CACHE_VERSION", tidal_module.CACHE_VERSION + 1)
+        tidal_module._load_or_cache(str(tmp_path), paths, True)
+        assert "Loading cached data" not in capsys.readouterr().out
+
+    def test_extract_year_index_variants(self):
+        data = read_tidal_data("data/1947ABE.txt")
+
+        # a timezone-aware index is compared in its own timezone
+        year = extract_single_year_remove_mean(1947, data.tz_localize('utc'))
+        assert year['Sea Level'].size == 8760
+        assert np.nanmean(year['Sea Level']) == pytest.approx(0)
+
+        # an unsorted index still gives the whole year
+        shuffled = data.sample(frac=1, random_state=0)
+        year = extract_single_year_remove_mean(1947, shuffled)
+        assert year['Sea Level'].size == 8760
+        assert np.nanmean(year['Sea Level']) == pytest.approx(0)
+
+        # a year without data gives an empty frame, without warnings
+        import warnings
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            assert extract_single_year_remove_mean(1900, data).empty
+
+    def test_reading_empty_file(self, tmp_path, monkeypatch, request):
+        request.addfinalizer(tidal_module._read_tidal_file.cache_clear)
+        empty_file = tmp_path / "empty.txt"
+        short_file = tmp_path / "short.txt"
+        empty_file.write_text("")
+        short_file.write_text("header\n" * 5)
+
+        # both readers report a file without data the same way
+        for path in (empty_file, short_file):
+            with pytest.raises(pd.errors.EmptyDataError):
+                read_tidal_data(str(path))
+        monkeypatch.setattr(tidal_module, "pa", None)
+        monkeypatch.setattr(tidal_module, "pa_csv", None)
+        tidal_module._read_tidal_file.cache_clear()
+        for path in (empty_file, short_file):
+            with pytest.raises(pd.errors.EmptyDataError):
+                read_tidal_data(str(path))
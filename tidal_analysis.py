@@ -1,14 +1,321 @@
 'Copyright 2025, Lois Cole'
-# import the modules you need here
+# Standard library modules.
 import argparse
-import datetime
-import glob
+import collections
+import datetime  # Re-exported, see __all__.
+import functools
+import json
 import os
-import pytz
-import matplotlib.dates as mdates
+from concurrent.futures import ProcessPoolExecutor
+# Third-party modules. Only what the analysis needs is imported here:
+# plotting libraries are not, and test tools belong in test/.
+import numpy as np
 import pandas as pd
+import pytz  # Re-exported, see __all__.
 import uptide
 from scipy import stats
+# pyarrow is optional; it speeds up reading and enables the Parquet cache.
+try:
+    import pyarrow as pa
+    from pyarrow import compute as pc
+    from pyarrow import csv as pa_csv
+    from pyarrow import parquet as pa_parquet
+except ImportError:
+    pa = None
+    pc = None
+    pa_csv = None
+    pa_parquet = None
+
+# The public API; datetime and pytz are re-exported for building the
+# timezone-aware start times that tidal_analysis expects.
+__all__ = [
+    'read_tidal_data', 'extract_single_year_remove_mean', 'extract_section_remove_mean',
+    'join_data', 'sea_level_rise', 'tidal_analysis', 'get_longest_contiguous_data',
+    'datetime', 'pytz',
+]
+
+# Number of header lines preceding the data in each tidal file.
+HEADER_ROWS = 11
+# Name of the Parquet cache of compiled data kept in the data directory.
+CACHE_NAME = '_cache.parquet'
+# Parquet schema metadata key recording the data files a cache was built from.
+SOURCE_KEY = b'tidal_analysis.source'
+# Version of the parsed data format saved in Parquet; increase it whenever
+# the parsing changes, so that caches written by older versions are not used.
+CACHE_VERSION = 1
+# Suffix added to a data file's name for its own Parquet copy of the parsed data.
+PARSED_SUFFIX = '.parquet'
+# Whether read_tidal_data saves (and reuses) a Parquet copy of each file.
+PARQUET_COPIES = True
+# Nanoseconds in one day, for converting int64 timestamps to days.
+NS_PER_DAY = 86400 * 10**9
+# The only columns parsed from each file; 'Cycle' and 'Residual' are skipped.
+USED_COLUMNS = ('Date', 'Time', 'Sea Level')
+# The Arrow types of the parsed columns.
+PARSED_TYPES = {'Date': 'string', 'Time': 'string', 'Sea Level': 'float32',
+                'Datetime': 'timestamp[ns]'}
+
+def _cache_tag(source):
+    """
+    Returns the metadata identifying what a Parquet cache was built from,
+    so that a cache written by a different parser version is not used.
+
+    Parameters
+    ----------
+    source : JSON-serialisable
+        Describes the data files the cache was built from.
+
+    Returns
+    -------
+    bytes
+        The JSON-encoded format version, parsed column types and source.
+    """
+    return json.dumps({'version': CACHE_VERSION, 'columns': USED_COLUMNS,
+                       'types': PARSED_TYPES, 'source': source}).encode()
+
+def _read_cache(path, tag):
+    """
+    Reads a Parquet cache, if it was written with the given tag (see _cache_tag).
+    The tag is checked before any data is read; a missing, unreadable or
+    foreign cache simply does not match.
+
+    Parameters
+    ----------
+    path : str
+        The path of the cache.
+    tag : bytes
+        The tag the cache must have been written with.
+
+    Returns
+    -------
+    pyarrow.Table or None
+        The cached data, or None if the cache does not match.
+    """
+    try:
+        if pa_parquet.read_schema(path).metadata.get(SOURCE_KEY) == tag:
+            return pa_parquet.read_table(path)
+    except (OSError, ValueError, AttributeError):
+        pass
+    return None
+
+def _write_cache(path, table, tag):
+    """
+    Writes a table to a Parquet cache with the given tag, via a temporary
+    file so that a partly written cache is never read.
+
+    Parameters
+    ----------
+    path : str
+        The path of the cache.
+    table : pyarrow.Table
+        The data to cache.
+    tag : bytes
+        The tag to record in the cache's metadata.
+
+    Raises
+    ------
+    OSError
+        If the cache cannot be written (e.g. the directory is read-only).
+    """
+    metadata = {**(table.schema.metadata or {}), SOURCE_KEY: tag}
+    pa_parquet.write_table(table.replace_schema_metadata(metadata), path + '.tmp',
+                           compression='zstd')
+    os.replace(path + '.tmp', path)
+
+def _read_gauge_arrow(filename, column_names):
+    """
+    Parses a tidal data file with pyarrow, straight from its memory map.
+
+    Arrow's CSV reader cannot split on runs of spaces, so it only reads each
+    line after the header as one string; the lines are then split on
+    whitespace, and the used fields picked out, by Arrow compute kernels.
+    Values carrying a quality flag suffix (e.g. '2.1336M', or a bare 'M')
+    become missing data. 'Date' and 'Time' are combined into a 'Datetime'
+    column while the data is still held in Arrow.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the text file containing the tidal data.
+    column_names : list of strings
+        The names of the fields on each line.
+
+    Returns
+    -------
+    pyarrow.Table
+        The used columns of the file plus 'Datetime'.
+
+    Raises
+    ------
+    pandas.errors.EmptyDataError
+        If there is no data after the header.
+    """
+    # Read lines as single strings: the delimiter (ASCII unit separator) and
+    # quotes never occur, and with UTF-8 checks off the read can only fail
+    # when there are no lines after the header.
+    try:
+        with pa.memory_map(filename, 'r') as source:
+            lines = pa_csv.read_csv(
+                source,
+                read_options=pa_csv.ReadOptions(skip_rows=HEADER_ROWS, column_names=['line']),
+                parse_options=pa_csv.ParseOptions(delimiter='\x1f', quote_char=False),
+                convert_options=pa_csv.ConvertOptions(column_types={'line': pa.string()},
+                                                      check_utf8=False)
+            )['line']
+    except pa.ArrowInvalid as e:
+        raise pd.errors.EmptyDataError(f'No data after the header in {filename}') from e
+    # pyarrow.compute generates its kernels at import time, so look them up by name.
+    fields = pc.call_function(
+        'utf8_split_whitespace', [pc.call_function('utf8_trim_whitespace', [lines])]
+    )
+    # Skip blank lines, and any too short to hold the used fields.
+    last = max(column_names.index(name) for name in USED_COLUMNS)
+    fields = fields.filter(pc.call_function(
+        'greater', [pc.call_function('list_value_length', [fields]), last]
+    ))
+    if len(fields) == 0:
+        raise pd.errors.EmptyDataError(f'No data after the header in {filename}')
+    columns = {name: pc.call_function('list_element', [fields, column_names.index(name)])
+               for name in USED_COLUMNS}
+    flagged = pc.call_function('match_substring_regex', [columns['Sea Level']],
+                               pc.MatchSubstringOptions('[MNT]$'))
+    columns['Sea Level'] = pc.call_function(
+        'if_else', [flagged, pa.scalar(None, pa.string()), columns['Sea Level']]
+    ).cast(PARSED_TYPES['Sea Level'])
+    joined = pc.call_function('binary_join_element_wise',
+                              [columns['Date'], columns['Time'], ' '])
+    columns['Datetime'] = pc.call_function(
+        'strptime', [joined], pc.StrptimeOptions('%Y/%m/%d %H:%M:%S', unit='ns')
+    )
+    return pa.table(columns)
+
+def _arrow_to_pandas(table):
+    """
+    Converts an Arrow table to pandas, keeping string columns Arrow-backed
+    rather than turning them into Python objects.
+
+    The table is converted column by column, freeing each Arrow column as it
+    is converted so the data is never held in memory twice; the table cannot
+    be used afterwards.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        The table to convert.
+
+    Returns
+    -------
+    pandas DataFrame
+        The converted data.
+    """
+    return table.to_pandas(
+        types_mapper={pa.string(): pd.StringDtype('pyarrow')}.get,
+        split_blocks=True,
+        self_destruct=True
+    )
+
+def _parse_tidal_file(filename, file_key):
+    """
+    Parses a tidal data file; the uncached worker behind read_tidal_data.
+
+    With pyarrow, the parsed data is also saved to a Parquet copy next to the
+    file (unless PARQUET_COPIES is off), which is read instead of the file
+    while it still matches the file's modification time and size, and the
+    format version and column types (see _cache_tag).
+
+    Parameters
+    ----------
+    filename : str
+        The path to the text file containing the tidal data.
+    file_key : tuple
+        The file's modification time (ns) and size, so that a changed file
+        is parsed again rather than served from the cache.
+
+    Returns
+    -------
+    data : pandas DataFrame
+        The parsed data, indexed by 'Datetime'.
+    """
+    # Define expected column names.
+    column_names = ['Cycle', 'Date', 'Time', 'Sea Level', 'Residual']
+    # Read the csv file data into a pandas DataFrame,
+    # using pyarrow when it is installed and the C engine otherwise.
+    if pa_csv is not None:
+        parsed, tag = filename + PARSED_SUFFIX, _cache_tag(list(file_key))
+        table = _read_cache(parsed, tag) if PARQUET_COPIES else None
+        if table is None:
+            table = _read_gauge_arrow(filename, column_names)
+            if PARQUET_COPIES:
+                try:
+                    _write_cache(parsed, table, tag)
+                except OSError:
+                    # Read-only data is simply parsed every time.
+                    pass
+        data = _arrow_to_pandas(table)
+    else:
+        # The C tokenizer splits on runs of whitespace itself, reading the file
+        # directly. Quality flags are suffixes on the values (e.g. '2.1336M'),
+        # so 'Sea Level' is read as text and flagged values coerced to NaN.
+        data = pd.read_csv(filename, sep=r'\s+', skiprows=HEADER_ROWS, header=None,
+                           engine='c', names=column_names, usecols=USED_COLUMNS,
+                           dtype=dict.fromkeys(USED_COLUMNS, str))
+        if data.empty:
+            raise pd.errors.EmptyDataError(f'No data after the header in {filename}')
+        data['Sea Level'] = pd.to_numeric(data['Sea Level'],
+                                          errors='coerce').astype(PARSED_TYPES['Sea Level'])
+        # Parse 'Date' and 'Time' together with an explicit format,
+        # caching repeated values; parsing 'Time' as a timedelta is much slower.
+        data['Datetime'] = pd.to_datetime(data['Date'] + ' ' + data['Time'],
+                                          format='%Y/%m/%d %H:%M:%S', cache=True)
+    # Set the 'Datetime' column as the DataFrame's index.
+    data.set_index('Datetime', inplace=True)
+    return data
+
+@functools.lru_cache(maxsize=256)
+def _read_tidal_file(filename, file_key):
+    """
+    Parses a tidal data file, cached so that an unchanged file is only
+    parsed once per process.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the text file containing the tidal data.
+    file_key : tuple
+        The file's modification time (ns) and size, as from _file_key.
+
+    Returns
+    -------
+    data : pandas DataFrame
+        The parsed data, indexed by 'Datetime'. Must not be modified.
+    """
+    return _parse_tidal_file(filename, file_key)
+
+def _file_key(filename):
+    """
+    Returns the modification time (ns) and size of a file, which identify
+    its contents for caching.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file.
+
+    Returns
+    -------
+    tuple
+        (st_mtime_ns, st_size) of the file.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the specified 'filename' cannot be found or does not exist.
+    """
+    try:
+        file_stat = os.stat(filename)
+    except FileNotFoundError:
+        raise FileNotFoundError(f'Error: File not found: {filename}') from None
+    return file_stat.st_mtime_ns, file_stat.st_size
 
 def read_tidal_data(filename):
     """
@@ -32,23 +339,49 @@ def read_tidal_data(filename):
         with a DatetimeIndex and a 'Sea Level' column.
             Non- numeric entries (e.g. 'M', 'N' and 'T') will be converted to NaN.
     """
-    # Check if file exists. If not, raise error message.
-    if not os.path.exists(filename):
-        raise FileNotFoundError(f'Error: File not found: {filename}')
-    # Define expected column names.
-    column_names = ['Cycle', 'Date', 'Time', 'Sea Level', 'Residual']
-    # Specify non-numerical values that should be converted to NaN.
-    na_values=['M', 'N', 'T']
-    # Read the csv file data into a pandas DataFrame.
-    data = pd.read_csv(filename, sep=r'\s+', skiprows=11, header = None,
-                       names=column_names, na_values=na_values)
-    # Combine 'Date' and 'Time' into a single string,
-    # convert this into a datetime object,
-    # and then set the 'Datetime' column as the DataFrame's index.
-    data['Datetime'] = pd.to_datetime(data['Date'] + ' ' + data['Time'])
-    data.set_index('Datetime', inplace=True)
-    data['Sea Level'] = pd.to_numeric(data['Sea Level'], errors='coerce')
-    return data
+    # Check if file exists (raising an error if not), then reuse the parsed
+    # data while the file is unchanged, returning a copy so that callers can
+    # modify it without altering the cached DataFrame.
+    return _read_tidal_file(filename, _file_key(filename)).copy()
+
+def _remove_section_mean(data, start, end):
+    """
+    Extracts the 'Sea Level' data between two times and removes its mean.
+
+    For a sorted DatetimeIndex the section is located positionally and sliced
+    from the underlying array; otherwise it is selected with a boolean mask,
+    keeping the rows in their original order. Its float64 copy is the only
+    allocation, with the mean (ignoring NaNs) subtracted in place.
+
+    Parameters
+    ----------
+    data : pandas DataFrame
+        The source DataFrame containing 'Sea Level' data with a DatetimeIndex,
+        which may be timezone-aware.
+    start, end : pandas.Timestamp
+        The first and last times of the section (inclusive), in the
+        index's local time.
+
+    Returns
+    -------
+    pandas DataFrame
+        A new DataFrame containing the section's 'Sea Level' data, with its mean
+        removed. It is empty if there is no data in the section, and all NaN
+        if there is no valid data.
+    """
+    # Compare like with like: naive bounds are taken to be in the index's timezone.
+    if data.index.tz is not None:
+        start = start.tz_localize(data.index.tz)
+        end = end.tz_localize(data.index.tz)
+    if data.index.is_monotonic_increasing:
+        section = data.index.slice_indexer(start, end)
+    else:
+        section = (data.index >= start) & (data.index <= end)
+    sea_level = data['Sea Level'].to_numpy()[section].astype(np.float64)
+    # Without valid data there is no mean to remove (and nanmean would warn).
+    if not np.isnan(sea_level).all():
+        np.subtract(sea_level, np.nanmean(sea_level), out=sea_level)
+    return pd.DataFrame({'Sea Level': sea_level}, index=data.index[section])
 
 def extract_single_year_remove_mean(year, data):
     """
@@ -56,23 +389,22 @@ def extract_single_year_remove_mean(year, data):
     
     Parameters
     ----------
-    year : integer
+    year : integer or string
         The year for which to extract and process data.
     data : pd.DataFrame
-       The source DataFrame containing 'Sea Level' data.
+       The source DataFrame containing 'Sea Level' data with a DatetimeIndex.
 
     Returns
     -------
     year_data : pandas.DataFrame
         A new DataFrame containing 'Sea Level' data for the specified year, 
-        with its mean removed from the data. 
+        with its mean removed from the data. It is empty if the year has no data.
     """
-    # Construct the start and end date strings,
-    # and then extract data from DatetimeIndex,
-    # and calculate the mean from every 'Sea Level' value in the DataFrame.
-    year_data = data.loc[str(year), ['Sea Level']].copy()
-    year_data['Sea Level'] -= year_data['Sea Level'].mean()
-    return year_data
+    # Construct the start and end timestamps of the year,
+    # and then remove the mean of the data between them.
+    start = pd.Timestamp(int(year), 1, 1)
+    end = pd.Timestamp(int(year), 12, 31, 23, 59, 59)
+    return _remove_section_mean(data, start, end)
 
 # Code from Gemini
 def extract_section_remove_mean(start, end, data):
@@ -93,17 +425,14 @@ def extract_section_remove_mean(start, end, data):
     -------
     pandas DataFrame
     A new DataFrame containing the extracted 'Sea Level' data, 
-    with its mean removed.
+    with its mean removed. It is empty if the section has no data.
     """
     # Convert start and end date strings to datetime.
     start_dt = pd.to_datetime(start, format='%Y%m%d')
     end_dt = pd.to_datetime(end, format='%Y%m%d') + pd.Timedelta(days=1) - pd.Timedelta(hours=1)
-    extracted_section = data.loc[start_dt:end_dt].copy()
-    if 'Sea Level' not in extracted_section.columns:
+    if 'Sea Level' not in data.columns:
         raise ValueError("The 'Sea Level' column is missing in the provided data.")
-    # Remove the mean from 'Sea Level' data.
-    extracted_section['Sea Level'] -= extracted_section['Sea Level'].mean()
-    return extracted_section
+    return _remove_section_mean(data, start_dt, end_dt)
 
 def join_data(data1, data2):
     """
@@ -122,10 +451,18 @@ def join_data(data1, data2):
          A new DataFrame, combining all rows from data1 and data2, 
          and sorting them chronologically through their DatetimeIndex.
      """
-    # Create a list with two DataFrames to be concatenated,
-    # stacking the DataFrames and ordering them chronologically.
-    combined_data = [data1, data2]
-    return pd.concat(combined_data).sort_index()
+    # When both DataFrames are already in order and do not overlap in time
+    # (e.g. two yearly files), stacking them the right way round is enough.
+    index1, index2 = data1.index, data2.index
+    if (len(index1) and len(index2)
+            and index1.is_monotonic_increasing and index2.is_monotonic_increasing):
+        if index1[-1] <= index2[0]:
+            return pd.concat([data1, data2], copy=False)
+        if index2[-1] <= index1[0]:
+            return pd.concat([data2, data1], copy=False)
+    # Otherwise stack the two DataFrames and order them chronologically,
+    # with a stable merge sort that makes use of any already sorted runs.
+    return pd.concat([data1, data2], copy=False).sort_index(kind='mergesort')
 
 def sea_level_rise(data):
     """
@@ -134,27 +471,125 @@ def sea_level_rise(data):
     Parameters
     ----------
     data : pandas.DataFrame
-    A DataFrame containing at least 'Date' (as strings like 'YYYY-MM-DD'
-    or 'YYYYMMDD'), 'Time' (as strings like 'HH:MM:SS'), and 'Sea Level' (float).
+    A DataFrame with a DatetimeIndex and a 'Sea Level' column (float).
 
     Returns
     -------
     tuple: (slope, p_value) from the linear regression (two floats).
+        As with scipy.stats.linregress, a single valid point gives NaNs,
+        two give a p-value of 0 (or 1 if their sea levels are equal), and
+        constant sea levels give a NaN p-value.
+
+    Raises
+    ------
+    ValueError
+        If there is no valid data, or all valid data share one timestamp.
     """
-    # Ensure 'Sea Level' is float and drop NaNs from it first.
-    df_clean = data.dropna(subset=['Sea Level']).copy()
-    df_clean['Combined_DateTime'] = pd.to_datetime(
-    df_clean['Date'].astype(str) + ' ' + df_clean['Time'].astype(str),
-    format='%Y/%m/%d %H:%M:%S',
-    errors='coerce'
-    )
-    # Drop rows where datetime conversion failed.
-    df_clean = df_clean.dropna(subset=['Combined_DateTime'])
-    # Convert datetime objects to Matplotlib dates (floats) for linear regression.
-    x = mdates.date2num(df_clean.index.to_pydatetime())
-    y = df_clean['Sea Level'].values
-    slope, _, _, p_value, _ = stats.linregress(x, y)
-    return slope, p_value
+    # Ensure 'Sea Level' is float.
+    sea_level = data['Sea Level'].to_numpy(dtype=np.float64)
+    # Work on the index's int64 nanoseconds directly; NaT is stored as the
+    # smallest int64, so one mask covers missing sea levels and timestamps.
+    timestamps = data.index.asi8
+    valid = ~np.isnan(sea_level) & (timestamps != np.iinfo(np.int64).min)
+    # Convert to days since the epoch (the same units as Matplotlib dates)
+    # for linear regression.
+    x = timestamps[valid] / NS_PER_DAY
+    y = sea_level[valid]
+    if x.size == 0:
+        raise ValueError("No valid sea level data to fit.")
+    if x.size == 1:
+        return np.nan, np.nan
+    # Closed-form least squares: only the slope and its p-value are needed,
+    # so three dot products replace linregress' full set of statistics.
+    dx = x - x.mean()
+    dy = y - y.mean()
+    sxx = dx @ dx
+    if sxx == 0:
+        raise ValueError("Cannot fit a trend when all timestamps are identical.")
+    sxy = dx @ dy
+    syy = dy @ dy
+    slope = sxy / sxx
+    dof = x.size - 2
+    # The degenerate cases are handled before dividing, as in linregress:
+    # a line through two points fits exactly (unless it is flat), and with
+    # constant sea levels the correlation, and so the p-value, is undefined.
+    if dof == 0:
+        return slope, 0.0 if y[0] != y[1] else 1.0
+    if syy == 0:
+        return slope, np.nan
+    # Two-sided t-test on the slope, as in scipy.stats.linregress.
+    residual_variance = max(syy - slope * sxy, 0.0) / dof
+    if residual_variance == 0:
+        return slope, 0.0
+    standard_error = np.sqrt(residual_variance / sxx)
+    return slope, 2 * stats.t.sf(abs(slope) / standard_error, dof)
+
+@functools.lru_cache(maxsize=32)
+def _make_tide(constituents_key, start_datetime):
+    """
+    Builds an Uptide Tides object, cached so repeated analyses with the
+    same constituents and start time reuse the constituent set-up.
+
+    Parameters
+    ----------
+    constituents_key : tuple of strings
+        The tidal constituent names (a tuple, so it can be hashed).
+    start_datetime : datetime.datetime
+        The start time of the analysis period.
+
+    Returns
+    -------
+    uptide.Tides
+        A Tides object with its initial time set. It must not be modified.
+    """
+    tide = uptide.Tides(list(constituents_key))
+    tide.set_initial_time(start_datetime)
+    return tide
+
+def _harmonic_fit(tide, sea_level, seconds):
+    """
+    Fits tidal constituents to sea level data by least squares; equivalent
+    to uptide.harmonic_analysis.
+
+    The design matrix of a mean term plus cosine and sine terms is built
+    from a single phase matrix, and solved directly by least squares.
+    Forming the normal equations instead would square its condition number,
+    losing accuracy for short records in which constituents of similar
+    frequency are hard to separate.
+
+    Parameters
+    ----------
+    tide : uptide.Tides
+        The constituents to fit, with the initial time set.
+    sea_level : numpy.ndarray
+        The sea level data (float64, no NaNs).
+    seconds : numpy.ndarray
+        The times of the data, in seconds since the initial time.
+
+    Returns
+    -------
+    A tuple containing the amplitudes and phases, in the order of tide.constituents.
+    """
+    n_constituents = len(tide.omega)
+    # Z0 is itself the mean term, and its sine term is identically zero.
+    has_sine = np.array(tide.constituents) != 'Z0'
+    n_mean = 0 if 'Z0' in tide.constituents else 1
+    phase = np.outer(seconds, tide.omega)
+    design = np.empty((len(seconds), n_mean + n_constituents + has_sine.sum()))
+    design[:, :n_mean] = 1.0
+    np.cos(phase, out=design[:, n_mean:n_mean + n_constituents])
+    np.sin(phase[:, has_sine], out=design[:, n_mean + n_constituents:])
+    del phase
+    coefficients = np.linalg.lstsq(design, sea_level, rcond=None)[0]
+    # Combine the cosine and sine coefficients into complex amplitudes,
+    # then correct for the nodal factors and equilibrium phases.
+    cosine = coefficients[n_mean:n_mean + n_constituents]
+    sine = np.zeros(n_constituents)
+    sine[has_sine] = coefficients[n_mean + n_constituents:]
+    amplitude = cosine - 1j * sine
+    amp = np.abs(amplitude) / tide.f
+    pha = (tide.phi + tide.u - np.angle(amplitude)) % (2 * np.pi)
+    return amp, pha
 
 def tidal_analysis(data, constituents, start_datetime):
     """
@@ -170,37 +605,46 @@ def tidal_analysis(data, constituents, start_datetime):
        A list of tidal constituent names ('M2' and 'S2')
     start_datetime : datetime.datetime
         The exact datetime object representing the start time of the analysis period.
+        Must be timezone-aware; a naive data index is taken to be in UTC.
+
+    Raises
+    ------
+    ValueError
+        If 'start_datetime' has no timezone.
 
     Returns
     -------
     A tuple containing the calculated amplitudes and phases. 
     """
-    _ = datetime.datetime
-    # Drop rows where 'Sea Level' data is missing (NaN).
-    data = data.dropna(subset=['Sea Level']).copy()
-    _ = pytz.utc
-    # Initialises an Uptide Tides object, specifying constituents and initial time.
-    data.index = data.index.tz_localize('utc')
-    tide = uptide.Tides(constituents)
-    tide.set_initial_time(start_datetime)
-    seconds_since = (
-        data.index.astype('int64').to_numpy()/1e9
-    ) - start_datetime.timestamp()
-    # Extracts 'Sea Level' column values as a NumPy array.
-    sea_level_values = data['Sea Level'].to_numpy()
-    amp, pha = uptide.harmonic_analysis(
-        tide,
-        sea_level_values,
-    seconds_since
-    )
+    # Times are compared as int64 nanoseconds, which are UTC whether or not
+    # the index is timezone-aware, so it needs no localising; the start time
+    # must be timezone-aware so that its offset is known.
+    if start_datetime.tzinfo is None:
+        raise ValueError("start_datetime must be timezone-aware (e.g. UTC).")
+    # Extracts 'Sea Level' column values as a NumPy array, with the index's
+    # int64 nanoseconds (a view, rather than the DatetimeIndex itself).
+    sea_level_values = data['Sea Level'].to_numpy(dtype=np.float64)
+    timestamps = data.index.asi8
+    # Mask out rows where the data is missing (NaN), copying only if there are any.
+    missing = np.isnan(sea_level_values)
+    if missing.any():
+        sea_level_values = sea_level_values[~missing]
+        timestamps = timestamps[~missing]
+    # Fetches the (cached) Uptide Tides object for these constituents and initial time.
+    tide = _make_tide(tuple(constituents), start_datetime)
+    # Subtract the start time in integer arithmetic,
+    # then convert to seconds in a single float pass.
+    start_ns = pd.Timestamp(start_datetime).value
+    seconds_since = (timestamps - start_ns).astype(np.float64) * 1e-9
+    amp, pha = _harmonic_fit(tide, sea_level_values, seconds_since)
     return amp, pha
 
 def get_longest_contiguous_data(data):
     """
     Identifies and returns the longest contiguous segment of data
     from the input DataFrame.
-    The segment starts at the beginning of the DataFrame and ends
-    just before the first encountered NaN or invalid data point.
+    The segment is the longest run of consecutive rows, anywhere in the
+    DataFrame, that contains no NaN or invalid data point.
     
     Parameters
     ----------
@@ -213,15 +657,268 @@ def get_longest_contiguous_data(data):
         The longest contiguous segment of the input DataFrame where 'Sea Level' is not NaN.
         Returns an empty DataFrame if the input is empty or contains no valid contiguous segments.
      """
-    nan_indices = data['Sea Level'].isna()
-    if nan_indices.any():
-        # Get the index of the first True (first NaN).
-        first_nan_idx_in_series = nan_indices[nan_indices].index[0]
-        # Get the positional integer index of this NaN in the DataFrame's index.
-        stop_idx_loc = data.index.get_loc(first_nan_idx_in_series)
-        # Slice the DataFrame up to (but not including) this position.
-        return data.iloc[:stop_idx_loc]
-    return data.copy()
+    missing = np.isnan(data['Sea Level'].to_numpy())
+    # With no gaps the whole DataFrame is the longest segment.
+    if not missing.any():
+        return data
+    valid = ~missing
+    # Positions where the mask switches between invalid and valid data,
+    # paired up as the [start, end) of each run of valid data.
+    padded = np.concatenate(([0], valid.view(np.int8), [0]))
+    runs = np.flatnonzero(np.diff(padded)).reshape(-1, 2)
+    if len(runs) == 0:
+        return data.iloc[:0]
+    start, end = runs[np.argmax(runs[:, 1] - runs[:, 0])]
+    return data.iloc[start:end]
+
+def _find_txt_files(root):
+    """
+    Finds all '.txt' files in a directory and its sub-directories.
+
+    Parameters
+    ----------
+    root : str
+        The directory to search.
+
+    Returns
+    -------
+    list of strings
+        The paths of the files found, sorted so that yearly files
+        are in chronological order.
+    """
+    stack = [root]
+    found = []
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                # Do not follow symlinked directories, which could form a loop;
+                # for other entries the type comes from the directory listing
+                # itself, without a stat call.
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.txt'):
+                    found.append(entry.path)
+    return sorted(found)
+
+def _count_rows(file_path):
+    """
+    Counts the lines after the header of a tidal data file, an upper bound
+    on its number of data rows, reading it in blocks.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the text file containing the tidal data.
+
+    Returns
+    -------
+    int
+        The number of lines after the header (0 if the file cannot be read).
+    """
+    lines = 1
+    try:
+        with open(file_path, 'rb') as source:
+            for block in iter(functools.partial(source.read, 1 << 20), b''):
+                lines += block.count(b'\n')
+    except OSError:
+        return 0
+    return max(lines - HEADER_ROWS, 0)
+
+def _stack_sea_level(paths, results, location_name, verbose):
+    """
+    Stacks the 'Sea Level' data of a location's files into one DataFrame,
+    copying each file's data in as its result arrives.
+
+    The arrays are allocated once, sized from the files' line counts, so only
+    the compiled data and the results not yet copied are held in memory.
+    Files that could not be read are reported and skipped.
+
+    Parameters
+    ----------
+    paths : list of strings
+        The paths of the location's files.
+    results : iterable of tuples
+        The (data, error) results of _ingest for the files, in the same order.
+    location_name : str
+        The name of the location, for progress messages.
+    verbose : bool
+        Whether to print progress messages.
+
+    Returns
+    -------
+    pandas DataFrame or None
+        The 'Sea Level' data of all files, with a sorted DatetimeIndex,
+        or None if no file had any data.
+    """
+    capacity = sum(_count_rows(file_path) for file_path in paths)
+    sea_level = np.empty(capacity, dtype=np.float32)
+    timestamps = np.empty(capacity, dtype=np.int64)
+    filled = 0
+    # The stacked data is sorted if each file is sorted and starts after the
+    # previous one ends, as yearly files read in name order do.
+    in_order = True
+    for file_path, (current_df, error) in zip(paths, results):
+        if error is not None:
+            print(error)
+            continue
+        # Warn if the DataFrame is empty.
+        if current_df.empty:
+            if verbose:
+                print(f"Warning: No valid data in {file_path}. Skipping.")
+            continue
+        rows = len(current_df)
+        if filled + rows > sea_level.size:
+            # The file grew after its lines were counted.
+            sea_level = np.resize(sea_level, filled + rows)
+            timestamps = np.resize(timestamps, filled + rows)
+        file_timestamps = current_df.index.asi8
+        in_order = (in_order and current_df.index.is_monotonic_increasing
+                    and (filled == 0 or timestamps[filled - 1] < file_timestamps[0]))
+        sea_level[filled:filled + rows] = current_df['Sea Level'].to_numpy()
+        timestamps[filled:filled + rows] = file_timestamps
+        filled += rows
+        if verbose:
+            print(f"Successfully read {file_path} for {location_name}.")
+    if filled == 0:
+        return None
+    # Trim any unused capacity in place, without copying.
+    sea_level.resize(filled, refcheck=False)
+    timestamps.resize(filled, refcheck=False)
+    compiled = pd.DataFrame(
+        {'Sea Level': sea_level},
+        index=pd.DatetimeIndex(timestamps.view('datetime64[ns]'), name='Datetime'),
+        copy=False
+    )
+    if not in_order:
+        # A stable merge sort makes use of the already sorted runs.
+        compiled.sort_index(kind='mergesort', inplace=True)
+    return compiled
+
+def _ingest(file_path):
+    """
+    Reads one tidal data file; run in a worker process by _read_locations.
+
+    Errors are caught here and returned as messages, so that the parent
+    process can report them in file order and carry on.
+
+    Parameters
+    ----------
+    file_path : str
+        The path to the text file containing the tidal data.
+
+    Returns
+    -------
+    tuple
+        (data, error): the 'Sea Level' data read, with its DatetimeIndex
+        (None on failure), and an error message (None on success).
+    """
+    try:
+        # Parse without the in-memory cache: a worker never reads a file twice,
+        # so caching would only keep every file it parsed alive in the pool.
+        # Only 'Sea Level' is returned, so that only it is sent back.
+        return _parse_tidal_file(file_path, _file_key(file_path))[['Sea Level']], None
+    # Handle specific exceptions during file processing.
+    except FileNotFoundError as e:
+        return None, f"Error: File not found: {file_path}. {e}"
+    except pd.errors.EmptyDataError:
+        return None, f"Error: {file_path} is empty or contains no data. Skipping."
+    except (pd.errors.ParserError, ValueError, KeyError) as e:
+        return None, f"Error: Malformed data in {file_path}. Details: {e}. Skipping."
+
+def _read_locations(paths, verbose):
+    """
+    Reads tidal data files in parallel processes and compiles them by location.
+
+    Files that cannot be read are reported and skipped.
+
+    Parameters
+    ----------
+    paths : list of strings
+        The paths of the files to read.
+    verbose : bool
+        Whether to print progress messages.
+
+    Returns
+    -------
+    dict
+        Maps each location name to a DataFrame of its 'Sea Level' data,
+        with a sorted DatetimeIndex.
+    """
+    # Group the files by location in one pass, deriving each location name
+    # once per directory rather than once per file.
+    names = {}
+    grouped = collections.defaultdict(list)
+    for file_path in paths:
+        directory = os.path.dirname(file_path)
+        if directory not in names:
+            # Extract and format location name from the directory.
+            names[directory] = os.path.basename(directory).replace('_data.txt', '').capitalize()
+        grouped[names[directory]].append(file_path)
+    locations = {}
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        # Submit every file up front, then stack each location's results
+        # in file order as they arrive.
+        results = {name: executor.map(_ingest, group) for name, group in grouped.items()}
+        for name, group in grouped.items():
+            compiled = _stack_sea_level(group, results[name], name, verbose)
+            if compiled is not None:
+                locations[name] = compiled
+    return locations
+
+def _load_or_cache(directory, paths, verbose):
+    """
+    Loads the compiled data for every location in a directory,
+    from a Parquet cache when it was built from exactly the current data files.
+
+    On a cache miss the files are parsed and compiled, and the result is
+    written to the cache for the next run. The cache records the path,
+    modification time and size of every file it was built from, so adding,
+    removing or changing any file (even keeping an older modification time)
+    invalidates it, as does a change of CACHE_VERSION. Caching needs pyarrow,
+    and is skipped (with a warning if verbose) when the directory is read-only.
+
+    Parameters
+    ----------
+    directory : str
+        The directory the data files were found in, where the cache is kept.
+    paths : list of strings
+        The paths of the data files.
+    verbose : bool
+        Whether to print progress messages.
+
+    Returns
+    -------
+    dict
+        Maps each location name to a DataFrame of its 'Sea Level' data,
+        with a sorted DatetimeIndex.
+    """
+    cache = os.path.join(directory, CACHE_NAME)
+    # Describe the files (path, modification time and size) before reading
+    # them, so that a file changing while it is read leaves a cache that no
+    # longer matches.
+    try:
+        manifest = (_cache_tag([(path, *_file_key(path)) for path in paths])
+                    if pa is not None and paths else None)
+    except OSError:
+        manifest = None
+    cached = _read_cache(cache, manifest) if manifest is not None else None
+    if cached is not None:
+        if verbose:
+            print(f"Loading cached data from {cache}.")
+        return {name: frame.drop(columns='Location')
+                for name, frame in cached.to_pandas().groupby('Location', sort=False)}
+
+    locations = _read_locations(paths, verbose)
+
+    if manifest is not None and locations:
+        table = pa.Table.from_pandas(pd.concat([frame.assign(Location=name)
+                                                for name, frame in locations.items()]))
+        try:
+            _write_cache(cache, table, manifest)
+        except OSError as e:
+            if verbose:
+                print(f"Warning: Could not write cache {cache}. {e}")
+    return locations
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser(
@@ -241,47 +938,22 @@ if __name__ == '__main__':
     # Ensure the directory exists
     if not os.path.isdir(input_directory):
         print(f"Error: Directory not found: {input_directory}")
-
-    filelist = glob.glob(os.path.join(input_directory, '**/*.txt'), recursive=True)
+        filelist = []
+    else:
+        filelist = _find_txt_files(input_directory)
     # Code from gemini.
     if is_verbose:
         print(f"Found {len(filelist)} data files. Compiling...")
-    # Store dataframes in a dictionary, grouped by their locations.
-    location_data = {}
-    # Iterate through each file in the provided list.
-    for file_path in filelist:
-        try:
-            current_df = read_tidal_data(file_path)
-            if not current_df.empty:
-                # Extract and format location name from the file path.
-                location_name = os.path.basename(os.path.dirname(file_path)
-                ).replace('_data.txt', '').capitalize()
-
-                if location_name not in location_data:
-                    location_data[location_name] = []
-                location_data[location_name].append(current_df)
-
-                if is_verbose:
-                    print(f"Successfully read {file_path} for {location_name}.")
-            # Warn if the DataFrame is empty.
-            elif is_verbose:
-                print(f"Warning: No valid data in {file_path}. Skipping.")
-        # Handle specific exceptions during file processing.
-        except FileNotFoundError as e:
-            print(f"Error: File not found: {file_path}. {e}")
-        except pd.errors.EmptyDataError:
-            print(f"Error: {file_path} is empty or contains no data. Skipping.")
-        except (pd.errors.ParserError, ValueError, KeyError) as e:
-            print(f"Error: Malformed data in {file_path}. Details: {e}. Skipping.")
+    # Read the files (or the cache of them) into one DataFrame per location.
+    location_data = _load_or_cache(input_directory, filelist, is_verbose)
 
     # Process and print data for each location.
-    for location, dfs in location_data.items():
+    for location, compiled_data in location_data.items():
         print(f"\n{'='*50}") # Separator for clarity.
         print(f"--- Analysis for {location} ---")
         print(f"{'='*50}")
 
         # 1. Compiled Tidal Data Summary.
-        compiled_data = pd.concat(dfs).sort_index() if dfs else pd.DataFrame()
         print("\n--- Compiled Tidal Data Summary ---")
         if len(compiled_data) > 10: # Print head and tail for large dataframes.
             print(compiled_data.head())
@@ -289,8 +961,8 @@ if __name__ == '__main__':
             print(compiled_data.tail())
         else: # Print entire dataframe if small.
             print(compiled_data)
-        print(f"Data range: {compiled_data.index.min().strftime('%Y-%m-%d %H:%M:%S')} to"
-              "{compiled_data.index.max().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"Data range: {compiled_data.index.min().strftime('%Y-%m-%d %H:%M:%S')} to "
+              f"{compiled_data.index.max().strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Total data points: {len(compiled_data)}")
         print("---------------------------------")
 